@@ -5,3 +5,4 @@
 #
 # Imports =====================================================================
 from bottle_gui import gui
+from federation import federated_gui
@@ -4,16 +4,27 @@
 # Interpreter version: python 2.7
 #
 # Imports =====================================================================
+import re
+import cgi
 import json
+import bisect
+import heapq
+import hashlib
 import inspect
+import uuid
 import os.path
+import urlparse
+import threading
 from string import Template
+from collections import deque
 
 import bottle
 from bottle import route, static_file, request, response
 
 from napoleon2html import napoleon_to_html
 
+from renderer import docstring_to_html
+
 
 # Variables ===================================================================
 TEMPLATE_PATH = "static/templates/"  #: Path to the template directory.
@@ -44,7 +55,22 @@ INDEX_TEMPLATE = read_template("index.html")  #: static/templates/index.html
 TABLE_TEMPLATE = read_template("table.html")  #: static/templates/table.html
 ROW_TEMPLATE   = read_template("row.html")  #: static/templates/row.html
 DESCR_TEMPLATE = read_template("descr.html")  #: static/templates/descr.html
-BLACKLIST = ["/", "/bottle_gui_static/"]
+TREE_INDEX_TEMPLATE = read_template("tree_index.html")  #: tree_index.html
+TREE_NODE_TEMPLATE = read_template("tree_node.html")  #: tree_node.html
+BLACKLIST = [
+    "/",
+    "/bottle_gui_static/",
+    "/bottle_gui_subtree",
+    "/bottle_gui_changes",
+    "/bottle_gui_search",
+]
+HISTORY_SIZE = 32  #: How many versions of the index are kept for delta sync.
+SEARCH_LIMIT = 50  #: Default maximal number of search results.
+RENDERERS = {  #: Docstring renderers, which can be selected in :func:`gui`.
+    "napoleon": napoleon_to_html,
+    "builtin": docstring_to_html,
+}
+WORD_RE = re.compile(r"[\w.]+", re.UNICODE)  #: Used to tokenize for search.
 
 
 # Classes =====================================================================
@@ -92,10 +118,16 @@ class RouteInfo(object):
 
         return s
 
-    def to_html(self):
+    def to_html(self, renderer=napoleon_to_html, base_url=""):
         """
         Convert informations about this route to HTML.
 
+        Args:
+            renderer (fn reference, default napoleon_to_html): Function used
+                to convert docstring to HTML. See :attr:`RENDERERS`.
+            base_url (str, default ""): URL the link to the route is relative
+                to. Used for routes of other services.
+
         Note:
             :attr:`DESCR_TEMPLATE` and :attr:`ROW_TEMPLATE` is used.
 
@@ -109,7 +141,7 @@ class RouteInfo(object):
             docstring = self.docstring.strip() or ""
 
             descr = Template(DESCR_TEMPLATE).substitute(
-                method_description=napoleon_to_html(docstring)
+                method_description=renderer(docstring)
             )
 
         # wrap arguments to the html
@@ -121,6 +153,7 @@ class RouteInfo(object):
 
         return Template(ROW_TEMPLATE).substitute(
             name=self.path,
+            url=urlparse.urljoin(base_url, self.path),
             args=args,
             http_type=self.method,
             method_description=descr
@@ -189,10 +222,16 @@ class RouteGroup(object):
 
         return ""
 
-    def to_html(self):
+    def to_html(self, renderer=napoleon_to_html, base_url=""):
         """
         Convert group and all contained paths to HTML.
 
+        Args:
+            renderer (fn reference, default napoleon_to_html): Function used
+                to convert docstrings to HTML. See :attr:`RENDERERS`.
+            base_url (str, default ""): URL the links are relative to. Used
+                for routes of other services.
+
         Note:
             :attr:`TABLE_TEMPLATE` is used.
 
@@ -201,10 +240,11 @@ class RouteGroup(object):
         """
         return Template(TABLE_TEMPLATE).substitute(
             name=self.get_path(),
+            url=urlparse.urljoin(base_url, self.get_path()),
             description=self.get_docstring(),
             rows="\n".join(
                 map(
-                    lambda x: x.to_html(),
+                    lambda x: x.to_html(renderer, base_url),
                     sorted(self.routes, key=lambda x: x.path)
                 )
             )
@@ -228,7 +268,555 @@ class RouteGroup(object):
         return "group: " + " ".join(map(lambda x: str(x), self.routes)) + "\n"
 
 
+class PathNode(object):
+    """
+    Node of the path tree used by the lazily expanded tree view.
+
+    Each node represents one segment of the path. Routes are stored in the
+    node matching their full path.
+
+    Args:
+        name (str): Name of the path segment.
+        path (str): Full path to this node.
+
+    Attributes:
+        name (str): See Args section for details.
+        path (str): See Args section for details.
+        children (dict): ``{segment_name: PathNode}``.
+        routes (list): :class:`RouteInfo` objects for this exact path.
+        count (int): Number of routes in this node and all its subnodes.
+    """
+    def __init__(self, name, path):
+        self.name = name
+        self.path = path
+        self.children = {}
+        self.routes = []
+        self.count = 0
+        self._names = None
+        self._route_levels = None
+
+    def add_route(self, route):
+        """
+        Add `route` to the subtree of this node, creating nodes on the way.
+
+        Args:
+            route (obj): :class:`RouteInfo` instance.
+        """
+        node = self
+        node.count += 1
+        node._route_levels = None
+        for segment in split_path(route.path):
+            if segment not in node.children:
+                node.children[segment] = PathNode(
+                    name=segment,
+                    path=node.path.rstrip("/") + "/" + segment
+                )
+                node._names = None
+
+            node = node.children[segment]
+            node.count += 1
+            node._route_levels = None
+
+        node.routes.append(route)
+
+    def find(self, path):
+        """
+        Find node for given `path` in subtree of this node.
+
+        Args:
+            path (str): Full path of the node.
+
+        Returns:
+            obj: :class:`PathNode` instance or None if not found.
+        """
+        node = self
+        for segment in split_path(path):
+            node = node.children.get(segment)
+
+            if node is None:
+                return None
+
+        return node
+
+    def sorted_children(self):
+        """
+        Return subnodes of this node.
+
+        Returns:
+            list: Subnodes sorted by their :attr:`name`.
+        """
+        if self._names is None:
+            self._names = sorted(self.children.keys())
+
+        return map(lambda x: self.children[x], self._names)
+
+    def route_levels(self):
+        """
+        Return routes in the subtree of this node grouped by their depth. The
+        result is cached, so each node is computed only once for each tree.
+
+        Returns:
+            list: Lists of :class:`RouteInfo` objects. First list contains \
+                  routes of this node sorted by HTTP method, next list \
+                  routes one level deeper sorted by path and so on.
+        """
+        if self._route_levels is None:
+            levels = [sorted(self.routes, key=lambda x: x.method)]
+            for child in self.sorted_children():
+                # most of the nodes are leaves, so they are not cached
+                if child.children:
+                    child_levels = child.route_levels()
+                elif len(child.routes) > 1:
+                    child_levels = [
+                        sorted(child.routes, key=lambda x: x.method)
+                    ]
+                else:
+                    child_levels = [child.routes]
+
+                for depth, routes in enumerate(child_levels, 1):
+                    if depth == len(levels):
+                        levels.append([])
+
+                    levels[depth].extend(routes)
+
+            self._route_levels = levels
+
+        return self._route_levels
+
+    def iter_prefix(self, path):
+        """
+        Iterate over routes in this subtree, which paths start with `path`.
+        Routes with shorter paths are yielded first.
+
+        Routes of the subtrees are cached in the nodes (see
+        :meth:`route_levels`), so taking first few routes is fast also for huge
+        subtrees.
+
+        Args:
+            path (str): Path prefix. Last segment may be incomplete.
+
+        Yields:
+            obj: :class:`RouteInfo` instances.
+        """
+        segments = split_path(path)
+
+        if not segments or path.endswith("/"):
+            node = self.find(path)
+            nodes = [node] if node else []
+        else:
+            parent = self.find("/".join(segments[:-1]))
+            nodes = []
+
+            if parent:
+                parent.sorted_children()  # make sure _names are ready
+                last = segments[-1]
+                pos = bisect.bisect_left(parent._names, last)
+                while pos < len(parent._names) and \
+                      parent._names[pos].startswith(last):
+                    nodes.append(parent.children[parent._names[pos]])
+                    pos += 1
+
+        # nodes are siblings sorted by name, so joining their levels keeps
+        # the routes sorted
+        levels = map(lambda x: x.route_levels(), nodes)
+        for depth in xrange(max(map(len, levels) or [0])):
+            for node_levels in levels:
+                if depth < len(node_levels):
+                    for route in node_levels[depth]:
+                        yield route
+
+    def to_html(self):
+        """
+        Convert this node to collapsed HTML list item, without the subtree.
+
+        Note:
+            :attr:`TREE_NODE_TEMPLATE` is used.
+
+        Returns:
+            str: HTML.
+        """
+        return Template(TREE_NODE_TEMPLATE).substitute(
+            name=self.name,
+            path=cgi.escape(self.path, quote=True),
+            count=self.count
+        )
+
+    def subtree_to_html(self, renderer=napoleon_to_html):
+        """
+        Convert routes of this node and collapsed list of its direct subnodes
+        to HTML fragment.
+
+        Args:
+            renderer (fn reference, default napoleon_to_html): Function used
+                to convert docstrings to HTML. See :attr:`RENDERERS`.
+
+        Note:
+            :attr:`TABLE_TEMPLATE` is used for routes.
+
+        Returns:
+            str: HTML fragment.
+        """
+        html = ""
+        if self.routes:
+            html = Template(TABLE_TEMPLATE).substitute(
+                name=self.path,
+                url=self.path,
+                description=self.routes[0].mdocstring or "",
+                rows="\n".join(
+                    map(
+                        lambda x: x.to_html(renderer),
+                        sorted(self.routes, key=lambda x: x.method)
+                    )
+                )
+            )
+
+        if self.children:
+            html += "<ul class=\"tree\">\n%s\n</ul>" % "\n".join(
+                map(
+                    lambda x: x.to_html(),
+                    self.sorted_children()
+                )
+            )
+
+        return html
+
+
+class SearchIndex(object):
+    """
+    Index used for searching in routes. Paths are searched using the tree of
+    :class:`PathNode` objects, words are searched using the inverted index
+    over paths, arguments, module names and docstrings.
+
+    Args:
+        routes (list): List of :class:`RouteInfo` objects.
+
+    Attributes:
+        tree (obj): Root :class:`PathNode`.
+        tokens (dict): ``{token: {RouteInfo: score}}``.
+        ordered (dict): ``{token: [RouteInfo]}`` sorted by path.
+        ranked (dict): ``{token: [RouteInfo]}`` sorted by score and path,
+            filled lazily.
+    """
+    PATH_WEIGHT = 8  #: Score for token matched in path.
+    ARGS_WEIGHT = 4  #: Score for token matched in argument names.
+    MODULE_WEIGHT = 2  #: Score for token matched in module name.
+    DOCSTRING_WEIGHT = 1  #: Score for token matched in docstring.
+
+    def __init__(self, routes):
+        self.tree = build_tree(routes)
+        self.tokens = {}
+        self.ordered = {}
+        self.ranked = {}
+
+        for route in sorted(routes, key=lambda x: x.path):
+            self._add(route, route.path, self.PATH_WEIGHT)
+            self._add(route, " ".join(route.args or []), self.ARGS_WEIGHT)
+            self._add(route, route.module_name, self.MODULE_WEIGHT)
+            self._add(route, route.docstring, self.DOCSTRING_WEIGHT)
+
+    def _add(self, route, text, weight):
+        """
+        Add tokens from `text` to the inverted index for `route`.
+
+        Args:
+            route (obj): :class:`RouteInfo` instance.
+            text (str): Text which will be tokenized.
+            weight (int): Score for each matched token.
+        """
+        for token in set(tokenize(text)):
+            postings = self.tokens.setdefault(token, {})
+
+            if route not in postings:
+                postings[route] = 0
+                self.ordered.setdefault(token, []).append(route)
+
+            postings[route] += weight
+
+    def _rank(self, token):
+        """
+        Return routes matching `token` sorted by score and path.
+
+        Args:
+            token (str): Token from the inverted index.
+
+        Returns:
+            list: :class:`RouteInfo` objects.
+        """
+        if token not in self.ranked:
+            # sort is stable, so the routes with same score stay sorted by path
+            self.ranked[token] = sorted(
+                self.ordered[token],
+                key=self.tokens[token].__getitem__,
+                reverse=True
+            )
+
+        return self.ranked[token]
+
+    def search(self, query, limit=SEARCH_LIMIT):
+        """
+        Search for routes matching the `query`.
+
+        Words in the `query` starting with ``/`` are used as path prefixes,
+        other words are looked up in the inverted index. All of them have to
+        match.
+
+        Args:
+            query (str): Query, for example ``/sources hist something``.
+            limit (int, default SEARCH_LIMIT): Maximal number of results.
+
+        Returns:
+            list: ``[{"score": int, "route": route_dict}]`` sorted by score.
+        """
+        words = query.split()
+        prefixes = filter(lambda x: x.startswith("/"), words)
+        tokens = set(tokenize(
+            " ".join(filter(lambda x: not x.startswith("/"), words))
+        ))
+
+        if limit < 1 or (not tokens and not prefixes):
+            return []
+
+        # only paths - take them from the tree, shortest first
+        if not tokens:
+            results = []
+            for route in self.tree.iter_prefix(prefixes[0]):
+                if len(results) >= limit:
+                    break
+
+                # tree matches /a/c also for /a/c/, so check all prefixes
+                if all(route.path.startswith(x) for x in prefixes):
+                    results.append({"score": 0, "route": route.to_dict()})
+
+            return results
+
+        if not all(token in self.tokens for token in tokens):
+            return []
+
+        # go through the smallest set of routes from the best matches
+        tokens = sorted(tokens, key=lambda x: len(self.tokens[x]))
+        first = self.tokens[tokens[0]]
+        others = map(lambda x: self.tokens[x], tokens[1:])
+        max_others = sum(map(lambda x: max(x.itervalues()), others))
+
+        scores = []
+        best = []  # heap with `limit` best scores
+        for route in self._rank(tokens[0]):
+            # rest of the routes can't get better score
+            if best and len(best) >= limit and \
+               best[0] >= first[route] + max_others:
+                break
+
+            if not all(route in x for x in others):
+                continue
+
+            if not all(route.path.startswith(x) for x in prefixes):
+                continue
+
+            score = first[route] + sum(x[route] for x in others)
+            scores.append((score, route))
+
+            if len(best) < limit:
+                heapq.heappush(best, score)
+            else:
+                heapq.heappushpop(best, score)
+
+        scores.sort(key=lambda (score, route): -score)
+
+        return map(
+            lambda (score, route): {"score": score, "route": route.to_dict()},
+            scores[:limit]
+        )
+
+
+class RouteIndex(object):
+    """
+    Versioned index of routes. Each change of the content of the routes
+    increments the :attr:`version` and is remembered, so the clients can ask
+    only for the differences since the version they already have.
+
+    Version counter starts from ``0`` in each process, so the clients get the
+    :attr:`token`, which contains also random :attr:`epoch` of the index.
+    Tokens from other processes (or from before the restart) don't match any
+    version in the history and the clients get the full snapshot.
+
+    Args:
+        history_size (int, default HISTORY_SIZE): How many versions are kept.
+
+    Attributes:
+        version (int): Version of the index. Starts at ``0`` with no routes.
+        epoch (str): Random identifier of this index.
+        hash (str): SHA1 hash of the content of the index.
+        routes (list): :class:`RouteInfo` objects from the last update.
+        search_index (obj): :class:`SearchIndex` for the actual version.
+        bottle_routes (list): Bottle routes the index was built from.
+        blacklist (tuple): :attr:`BLACKLIST` the index was built with.
+        history (deque): ``(token, {key: route_dict})`` tuples.
+    """
+    def __init__(self, history_size=HISTORY_SIZE):
+        self.version = 0
+        self.epoch = uuid.uuid4().hex[:12]
+        self.hash = self._hash({})
+        self.routes = []
+        self.search_index = SearchIndex([])
+        self.bottle_routes = None
+        self.blacklist = None
+        self.history = deque([(self.token, {})], maxlen=history_size)
+        self._lock = threading.Lock()
+
+    @property
+    def token(self):
+        """
+        Version token, which is unique across the processes.
+
+        Returns:
+            str: ``epoch-version``.
+        """
+        return "%s-%d" % (self.epoch, self.version)
+
+    def _hash(self, snapshot):
+        """
+        Compute hash of the `snapshot`.
+
+        Args:
+            snapshot (dict): ``{key: route_dict}``.
+
+        Returns:
+            str: Hex digest of the SHA1 hash.
+        """
+        return hashlib.sha1(json.dumps(snapshot, sort_keys=True)).hexdigest()
+
+    def _snapshot(self, routes):
+        """
+        Convert `routes` to dictionary keyed by method and path of the route.
+
+        Routes with same method and path are distinguished by ``#n`` suffix.
+
+        Args:
+            routes (list): List of :class:`RouteInfo` objects.
+
+        Returns:
+            dict: ``{key: route_dict}``.
+        """
+        snapshot = {}
+        for route in routes:
+            key = route.method + " " + route.path
+
+            unique_key = key
+            cnt = 1
+            while unique_key in snapshot:
+                unique_key = "%s#%d" % (key, cnt)
+                cnt += 1
+
+            snapshot[unique_key] = route.to_dict()
+
+        return snapshot
+
+    def update(self, routes):
+        """
+        Update the index with `routes`. New version is created only if the
+        content of the routes differs from the last version.
+
+        Args:
+            routes (list): List of :class:`RouteInfo` objects.
+
+        Returns:
+            bool: True if the new version was created.
+        """
+        snapshot = self._snapshot(routes)
+        content_hash = self._hash(snapshot)
+
+        with self._lock:
+            if content_hash == self.hash:
+                return False
+
+            self.routes = routes
+            self.search_index = SearchIndex(routes)
+            self.version += 1
+            self.hash = content_hash
+            self.history.append((self.token, snapshot))
+
+        return True
+
+    def delta(self, since):
+        """
+        Return changes of the index since version `since`.
+
+        Args:
+            since (str): Version :attr:`token` the client already has.
+
+        Returns:
+            dict: ``version`` (token), ``hash`` and ``full`` keys. If \
+                  ``full`` is False, there are also ``added``, ``removed`` \
+                  and ``changed`` lists with route dicts. If the `since` \
+                  token is not in the :attr:`history`, ``full`` is True and \
+                  there is only ``routes`` key with all routes.
+        """
+        with self._lock:
+            version = self.token
+            content_hash = self.hash
+            snapshots = dict(self.history)
+
+        new = snapshots[version]
+        old = snapshots.get(since)
+
+        if old is None:
+            return {
+                "version": version,
+                "hash": content_hash,
+                "full": True,
+                "routes": [new[key] for key in sorted(new)],
+            }
+
+        return {
+            "version": version,
+            "hash": content_hash,
+            "full": False,
+            "added": [new[key] for key in sorted(new) if key not in old],
+            "removed": [old[key] for key in sorted(old) if key not in new],
+            "changed": [
+                new[key]
+                for key in sorted(new)
+                if key in old and old[key] != new[key]
+            ],
+        }
+
+
 # Functions ===================================================================
+def tokenize(text):
+    """
+    Split `text` to lowercase tokens for the search. Words joined by ``_``
+    or ``.`` are returned both as whole and as parts.
+
+    Args:
+        text (str): Text to tokenize.
+
+    Returns:
+        list: Tokens.
+    """
+    tokens = []
+    for word in WORD_RE.findall((text or "").lower()):
+        parts = filter(None, word.replace(".", "_").split("_"))
+        tokens.extend(parts)
+
+        if len(parts) > 1:
+            tokens.append(word.strip("._"))
+
+    return tokens
+
+
+def split_path(path):
+    """
+    Split `path` to non-blank segments.
+
+    Args:
+        path (str): Path, for example ``/sources/hist/``.
+
+    Returns:
+        list: Segments, for example ``["sources", "hist"]``.
+    """
+    return filter(None, path.split("/"))
+
+
 def list_routes():
     """
     Get list of :class:`RouteInfo` objects from bottle introspection.
@@ -251,6 +839,30 @@ def list_routes():
     )
 
 
+def update_index():
+    """
+    Update :attr:`ROUTE_INDEX` with routes, which are not in
+    :attr:`BLACKLIST`. Nothing is done when bottle routes and the
+    :attr:`BLACKLIST` didn't change since the last update.
+
+    Returns:
+        obj: Updated :attr:`ROUTE_INDEX`.
+    """
+    bottle_routes = bottle.default_app().routes
+    blacklist = tuple(BLACKLIST)
+    if ROUTE_INDEX.bottle_routes == bottle_routes and \
+       ROUTE_INDEX.blacklist == blacklist:
+        return ROUTE_INDEX
+
+    ROUTE_INDEX.update(
+        filter(lambda x: x.path not in blacklist, list_routes())
+    )
+    ROUTE_INDEX.bottle_routes = list(bottle_routes)
+    ROUTE_INDEX.blacklist = blacklist
+
+    return ROUTE_INDEX
+
+
 def group_routes(ungrouped_routes):
     """
     Group list of :class:`RouteInfo` objects in `ungrouped_routes` by their
@@ -309,12 +921,14 @@ def group_routes(ungrouped_routes):
     return groups
 
 
-def to_html(grouped_routes):
+def to_html(grouped_routes, renderer=napoleon_to_html):
     """
     Convert list of :class:`RouteGroup` objects in `group_routes` to HTML.
 
     Args:
         grouped_routes (list): Llist of :class:`RouteGroup` objects.
+        renderer (fn reference, default napoleon_to_html): Function used to
+            convert docstrings to HTML. See :attr:`RENDERERS`.
 
     Returns:
         str: HTML page with routes.
@@ -322,13 +936,50 @@ def to_html(grouped_routes):
     return Template(INDEX_TEMPLATE).substitute(
         tables="\n".join(
             map(
-                lambda x: x.to_html(),
+                lambda x: x.to_html(renderer),
                 sorted(grouped_routes, key=lambda x: x.get_path())
             )
         )
     )
 
 
+def build_tree(routes):
+    """
+    Build tree of :class:`PathNode` objects from `routes`.
+
+    Args:
+        routes (list): List of :class:`RouteInfo` objects.
+
+    Returns:
+        obj: Root :class:`PathNode`.
+    """
+    root = PathNode(name="/", path="/")
+    for route in routes:
+        root.add_route(route)
+
+    return root
+
+
+def tree_to_html(tree, renderer="napoleon"):
+    """
+    Convert only the top level of the `tree` to HTML. Subtrees are fetched by
+    the browser from ``/bottle_gui_subtree`` when expanded.
+
+    Args:
+        tree (obj): Root :class:`PathNode` as returned by :func:`build_tree`.
+        renderer (str, default "napoleon"): Name of the docstring renderer
+            from :attr:`RENDERERS`, which is used also for the subtrees.
+
+    Returns:
+        str: HTML page with the tree.
+    """
+    return Template(TREE_INDEX_TEMPLATE).substitute(
+        count=tree.count,
+        renderer=renderer,
+        tree=tree.subtree_to_html(RENDERERS[renderer])
+    )
+
+
 def to_json(grouped_routes):
     """
     Convert list of :class:`RouteGroup` objects in `grouped_routes` to JSON.
@@ -351,33 +1002,61 @@ def to_json(grouped_routes):
     )
 
 
-def gui(path="/"):
+ROUTE_INDEX = RouteIndex()  #: Shared instance of :class:`RouteIndex`.
+
+
+def gui(path="/", tree=False, renderer="napoleon"):
     """
     Run `bootle-gui` at given `path`.
 
     Args:
         path (str, default "/"): Bottle path on which the application will be
              available.
+        tree (bool, default False): Render only the top level of the path
+             tree and let the browser load the subtrees on demand. Useful
+             for huge APIs.
+        renderer (str, default "napoleon"): Name of the docstring renderer
+             from :attr:`RENDERERS`. ``builtin`` is much faster, but supports
+             only subset of the napoleon format.
 
     Returns:
         fn reference: Function, which provides the `bottle-gui` functionality,\
                       mapped to bottle `path`.
+
+    Raises:
+        ValueError: If the `renderer` is not known.
     """
-    @route(path)
+    if renderer not in RENDERERS:
+        raise ValueError("Unknown renderer `%s`." % renderer)
+
+    # options are passed in route config, because bottle can't introspect
+    # closures over non-function values (see Route.get_undecorated_callback)
+    @route(path, tree=tree, renderer=renderer)
     def root():
         """
         Handle requests to root of the project.
         """
-        grouped_routes = group_routes(
-            filter(lambda x: x.path not in BLACKLIST, list_routes())
-        )
+        index = update_index()
+        routes = index.routes
 
         accept = request.headers.get("Accept", "")
         if "json" in request.content_type.lower() or "json" in accept.lower():
+            etag = '"%s"' % index.hash
+            response.set_header("ETag", etag)
+            response.set_header("X-Index-Version", index.token)
+
+            if request.headers.get("If-None-Match") == etag:
+                response.status = 304
+                return ""
+
             response.content_type = "application/json; charset=utf-8"
-            return to_json(grouped_routes)
+            return to_json(group_routes(routes))
 
-        return to_html(grouped_routes)
+        renderer = request.route.config["renderer"]
+        if request.route.config.get("tree"):
+            return tree_to_html(index.search_index.tree, renderer)
+
+        return to_html(group_routes(routes), RENDERERS[renderer])
 
     return root
 
@@ -391,3 +1070,66 @@ def get_static(fn):
         fn,
         root=os.path.join(os.path.dirname(__file__), 'static/')
     )
+
+
+@route("/bottle_gui_subtree")
+def get_subtree():
+    """
+    Serve pre-rendered HTML fragment with subtree for `path` parameter.
+    """
+    renderer = RENDERERS.get(request.query.get("renderer", "napoleon"))
+    if renderer is None:
+        bottle.abort(400, "Unknown renderer.")
+
+    # the tree is cached in the search index, so it is not rebuilt per click
+    tree = update_index().search_index.tree
+
+    node = tree.find(request.query.get("path", "/"))
+    if node is None:
+        bottle.abort(404, "Path not found.")
+
+    return node.subtree_to_html(renderer)
+
+
+@route("/bottle_gui_changes")
+def get_changes():
+    """
+    Serve JSON with changes of the index since version token in `since`
+    parameter. Unknown tokens get the full snapshot.
+    """
+    since = request.query.get("since", "")
+
+    response.content_type = "application/json; charset=utf-8"
+    return json.dumps(
+        update_index().delta(since),
+        indent=4,
+        separators=(',', ': ')
+    )
+
+
+@route("/bottle_gui_search")
+def get_search():
+    """
+    Serve JSON with routes matching the `q` parameter.
+    """
+    try:
+        limit = int(request.query.get("limit", SEARCH_LIMIT))
+    except ValueError:
+        bottle.abort(400, "`limit` must be integer.")
+
+    if limit < 1:
+        bottle.abort(400, "`limit` must be positive.")
+
+    query = request.query.getunicode("q", default=u"")
+    index = update_index()
+
+    response.content_type = "application/json; charset=utf-8"
+    return json.dumps(
+        {
+            "version": index.token,
+            "query": query,
+            "results": index.search_index.search(query, limit),
+        },
+        indent=4,
+        separators=(',', ': ')
+    )
@@ -0,0 +1,391 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Interpreter version: python 2.7
+#
+"""
+Federated index, which aggregates JSON indexes of several services running
+`bottle-gui`.
+"""
+# Imports =====================================================================
+import cgi
+import json
+import time
+import socket
+import httplib
+import urllib2
+import threading
+from string import Template
+from multiprocessing.pool import ThreadPool
+
+from bottle import route, request, response
+from napoleon2html import napoleon_to_html
+
+from bottle_gui import RENDERERS
+from bottle_gui import RouteInfo
+from bottle_gui import RouteGroup
+from bottle_gui import read_template
+
+
+# Variables ===================================================================
+FEDERATION_TIMEOUT = 5  #: Timeout in seconds for download of all indexes.
+FEDERATION_WORKERS = 8  #: Maximal number of concurrent downloads.
+
+#: static/templates/federation_index.html
+FEDERATION_INDEX_TEMPLATE = read_template("federation_index.html")
+SERVICE_TEMPLATE = read_template("service.html")  #: service.html
+
+#: Keys of the route dicts, see :meth:`.RouteInfo.to_dict`.
+ROUTE_KEYS = [
+    "method",
+    "path",
+    "args",
+    "docstring",
+    "mdocstring",
+    "module_name",
+]
+
+
+# Classes =====================================================================
+class ServiceIndex(object):
+    """
+    Cached JSON index of one service.
+
+    Args:
+        url (str): URL of the `bottle-gui` of the service.
+
+    Attributes:
+        url (str): See Args section for details.
+        etag (str): ETag of the cached index, or None.
+        groups (list): Cached JSON index - list of ``{path: [routes]}``
+            dicts, or None if the index was never downloaded.
+        error (str): Description of the last error, or None.
+    """
+    def __init__(self, url):
+        self.url = url
+        self.etag = None
+        self.groups = None
+        self.error = None
+        self._lock = threading.Lock()
+
+    @property
+    def status(self):
+        """
+        Status of the service.
+
+        Returns:
+            str: ``ok``, ``stale`` if the last download failed, but there is \
+                 cached index, or ``down``.
+        """
+        if not self.error:
+            return "ok"
+
+        if self.groups is not None:
+            return "stale"
+
+        return "down"
+
+    def fetch(self, timeout=FEDERATION_TIMEOUT):
+        """
+        Download the index, or revalidate the cached one using ETag.
+
+        Errors are not raised, they are stored in :attr:`error`.
+
+        Args:
+            timeout (int, default FEDERATION_TIMEOUT): Timeout in seconds.
+        """
+        req = urllib2.Request(self.url, headers={"Accept": "application/json"})
+        if self.etag and self.groups is not None:
+            req.add_header("If-None-Match", self.etag)
+
+        groups = None
+        etag = None
+        error = None
+        try:
+            resp = urllib2.urlopen(req, timeout=timeout)
+            groups = self._validate(json.load(resp))
+            etag = resp.info().getheader("ETag")
+        except urllib2.HTTPError as e:
+            if e.code != 304:
+                error = str(e)
+        except (urllib2.URLError, httplib.HTTPException, socket.error,
+                ValueError) as e:
+            error = str(e) or e.__class__.__name__
+
+        # network I/O is done, so the lock is held only for the update
+        with self._lock:
+            if groups is not None:
+                self.groups = groups
+                self.etag = etag
+
+            self.error = error
+
+    def set_error(self, error):
+        """
+        Set the :attr:`error`, but keep the cached index.
+
+        Args:
+            error (str): Description of the error.
+        """
+        with self._lock:
+            self.error = error
+
+    def _validate(self, groups):
+        """
+        Make sure, that `groups` have the format of the JSON index.
+
+        Args:
+            groups (obj): Decoded JSON index.
+
+        Returns:
+            list: `groups`.
+
+        Raises:
+            ValueError: If the format of the index is unexpected.
+        """
+        def is_str(value, optional=True):
+            if optional and value is None:
+                return True
+
+            return isinstance(value, basestring)
+
+        if not isinstance(groups, list):
+            raise ValueError("Unexpected format of the index.")
+
+        for group in groups:
+            if not isinstance(group, dict) or len(group) != 1 or \
+               not isinstance(group.values()[0], list):
+                raise ValueError("Unexpected format of the route group.")
+
+            for route in group.values()[0]:
+                if not isinstance(route, dict) or \
+                   not is_str(route.get("method"), False) or \
+                   not is_str(route.get("path"), False) or \
+                   not route["path"].startswith("/") or \
+                   not all(is_str(route.get(x)) for x in ROUTE_KEYS[3:]):
+                    raise ValueError("Unexpected format of the route.")
+
+                args = route.get("args")
+                if args is not None and (not isinstance(args, list) or
+                                         not all(map(is_str, args))):
+                    raise ValueError("Unexpected format of the route args.")
+
+        return groups
+
+    def _to_route_info(self, route):
+        """
+        Convert route dict from the index to :class:`.RouteInfo`.
+
+        Index comes from other service, so the values, which are not escaped
+        by :class:`.RouteInfo`, are escaped here.
+
+        Args:
+            route (dict): Route dict, see :meth:`.RouteInfo.to_dict`.
+
+        Returns:
+            obj: :class:`.RouteInfo` instance.
+        """
+        def escape(value):
+            return cgi.escape(value, quote=True) if value else value
+
+        return RouteInfo(
+            method=escape(route["method"]),
+            path=escape(route["path"]),
+            args=map(escape, route.get("args") or []),
+            docstring=route.get("docstring"),
+            mdocstring=route.get("mdocstring"),
+            module_name=escape(route.get("module_name")),
+        )
+
+    def get_groups(self):
+        """
+        Convert cached index to :class:`.RouteGroup` objects.
+
+        Returns:
+            list: :class:`.RouteGroup` objects.
+        """
+        return map(
+            lambda group: RouteGroup(
+                map(self._to_route_info, group.values()[0])
+            ),
+            self.groups or []
+        )
+
+    def to_html(self, renderer=napoleon_to_html):
+        """
+        Convert the service and its routes to HTML.
+
+        Args:
+            renderer (fn reference, default napoleon_to_html): Function used
+                to convert docstrings to HTML. See :attr:`.RENDERERS`.
+
+        Note:
+            :attr:`SERVICE_TEMPLATE` is used.
+
+        Returns:
+            str: HTML.
+        """
+        return Template(SERVICE_TEMPLATE).substitute(
+            url=self.url,
+            status=self.status,
+            error=cgi.escape(self.error or ""),
+            tables="\n".join(
+                map(
+                    lambda x: x.to_html(renderer, self.url),
+                    sorted(self.get_groups(), key=lambda x: x.get_path())
+                )
+            )
+        )
+
+    def to_dict(self):
+        """
+        Return dictionary representation of the service. This method is used
+        for JSON output.
+
+        Returns:
+            dict: Dictionary with keys ``url``, ``status``, ``error`` and \
+                  ``routes`` with the cached index.
+        """
+        return {
+            "url": self.url,
+            "status": self.status,
+            "error": self.error,
+            "routes": self.groups or [],
+        }
+
+
+class Federation(object):
+    """
+    Group of :class:`ServiceIndex` objects, which are downloaded concurrently.
+
+    Args:
+        urls (list): URLs of the `bottle-gui` of the services.
+        timeout (int, default FEDERATION_TIMEOUT): Timeout for download of
+            all services.
+        workers (int, default FEDERATION_WORKERS): Number of threads used for
+            downloading.
+
+    Attributes:
+        services (list): :class:`ServiceIndex` objects.
+        timeout (int): See Args section for details.
+        workers (int): See Args section for details.
+    """
+    def __init__(self, urls, timeout=FEDERATION_TIMEOUT,
+                 workers=FEDERATION_WORKERS):
+        self.services = map(lambda x: ServiceIndex(x), urls)
+        self.timeout = timeout
+        self.workers = workers
+
+    def refresh(self):
+        """
+        Download or revalidate indexes of all services.
+
+        The downloads, which don't finish in :attr:`timeout`, are marked as
+        timed out and their cached indexes are used. They continue in the
+        background and update the cache when they finish.
+
+        Returns:
+            list: :class:`ServiceIndex` objects.
+        """
+        if not self.services:
+            return self.services
+
+        deadline = time.time() + self.timeout
+
+        pool = ThreadPool(min(self.workers, len(self.services)))
+        results = map(
+            lambda x: pool.apply_async(x.fetch, (self.timeout,)),
+            self.services
+        )
+        pool.close()  # threads end when the running downloads finish
+
+        for service, result in zip(self.services, results):
+            result.wait(max(0, deadline - time.time()))
+
+            if not result.ready():
+                service.set_error("Timed out.")
+
+        return self.services
+
+    def to_html(self, renderer=napoleon_to_html):
+        """
+        Convert all services to HTML page.
+
+        Args:
+            renderer (fn reference, default napoleon_to_html): Function used
+                to convert docstrings to HTML. See :attr:`.RENDERERS`.
+
+        Note:
+            :attr:`FEDERATION_INDEX_TEMPLATE` is used.
+
+        Returns:
+            str: HTML page.
+        """
+        return Template(FEDERATION_INDEX_TEMPLATE).substitute(
+            services="\n".join(
+                map(lambda x: x.to_html(renderer), self.services)
+            )
+        )
+
+    def to_json(self):
+        """
+        Convert all services to JSON.
+
+        Returns:
+            str: JSON list of :meth:`ServiceIndex.to_dict` dicts.
+        """
+        return json.dumps(
+            map(lambda x: x.to_dict(), self.services),
+            indent=4,
+            separators=(',', ': ')
+        )
+
+
+# Functions ===================================================================
+def federated_gui(urls, path="/", timeout=FEDERATION_TIMEOUT,
+                  workers=FEDERATION_WORKERS, renderer="napoleon"):
+    """
+    Run `bottle-gui` aggregating indexes of other services at given `path`.
+
+    Args:
+        urls (list): URLs where the :func:`.gui` of the services is mapped.
+        path (str, default "/"): Bottle path on which the application will be
+             available.
+        timeout (int, default FEDERATION_TIMEOUT): Timeout for download of
+            all services.
+        workers (int, default FEDERATION_WORKERS): Number of threads used for
+            downloading.
+        renderer (str, default "napoleon"): Name of the docstring renderer
+            from :attr:`.RENDERERS`.
+
+    Returns:
+        fn reference: Function, which provides the federated `bottle-gui`, \
+                      mapped to bottle `path`.
+
+    Raises:
+        ValueError: If the `renderer` is not known.
+    """
+    if renderer not in RENDERERS:
+        raise ValueError("Unknown renderer `%s`." % renderer)
+
+    # see gui() for why the federation is passed in route config
+    @route(
+        path,
+        federation=Federation(urls, timeout, workers),
+        renderer=renderer
+    )
+    def federated_root():
+        """
+        Handle requests to the federated index.
+        """
+        federation = request.route.config["federation"]
+        federation.refresh()
+
+        accept = request.headers.get("Accept", "")
+        if "json" in request.content_type.lower() or "json" in accept.lower():
+            response.content_type = "application/json; charset=utf-8"
+            return federation.to_json()
+
+        return federation.to_html(RENDERERS[request.route.config["renderer"]])
+
+    return federated_root
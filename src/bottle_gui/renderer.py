@@ -0,0 +1,525 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Interpreter version: python 2.7
+#
+"""
+Built-in renderer of Google/Napoleon docstrings to HTML.
+
+It supports only the subset used in the docstrings of the services - plain
+paragraphs with inline markup and ``Args``, ``Returns``, ``Yields``,
+``Raises``, ``Note`` and ``See Also`` sections, but it is much faster than
+:func:`napoleon2html.napoleon_to_html`, which goes through the docutils. The
+HTML uses the same structure and CSS classes as the docutils output.
+"""
+# Imports =====================================================================
+import re
+import inspect
+
+
+# Variables ===================================================================
+FIELD_NAME_LIMIT = 14  #: Longer field names are rendered on separate row.
+
+#: Sections and their types. ``fields`` sections are rendered to field list.
+SECTIONS = {
+    "args": "args",
+    "arguments": "args",
+    "parameters": "args",
+    "returns": "returns",
+    "return": "returns",
+    "yields": "yields",
+    "yield": "yields",
+    "raises": "raises",
+    "note": "note",
+    "see also": "seealso",
+}
+ADMONITION_TITLES = {
+    "note": "Note",
+    "seealso": "See also",
+}
+
+HEADER_RE = re.compile(r"^(\s*)([\w ]+):\s*$")
+TYPED_ARG_RE = re.compile(r"^(.+?)\s*\(\s*(.*\S)\s*\)$")
+# docutils recognizes inline markup only after whitespace or some punctuation
+# and only when the end-string is followed by whitespace or punctuation, so
+# for example ``*args and **kwargs`` is left as it is. Start-string between
+# quotes or brackets (``"*"``) is not markup either. Only ASCII punctuation is
+# supported.
+QUOTES = ["''", '""', "()", "[]", "{}", "<>"]
+START_STRING_PREFIX = r"(?:^|(?<=[\s\"'(<\[{/:-]))(?!%s)" % "|".join(
+    map(
+        lambda x: r"(?<=%s)(?:\*\*?|``?|:[\w:.-]+:`)%s" % (
+            re.escape(x[0]),
+            re.escape(x[1])
+        ),
+        QUOTES
+    )
+)
+END_STRING_SUFFIX = r"(?=$|[\s\\.,;!?/:\"')>\]}-])"
+INLINE_RE = re.compile(
+    START_STRING_PREFIX + "(?:"
+    r"\*\*(?P<strong>\S(?:.*?[^\s\\])??)\*\*"
+    r"|\*(?P<em>[^\s*](?:.*?[^\s\\])??)\*"
+    r"|``(?P<literal>\S(?:.*?\S)??)``"
+    r"|:[\w:.-]+:`(?P<role>[^\s`](?:.*?[^\s\\])??)`"
+    r"|`(?P<cite>[^\s`](?:.*?[^\s\\])??)`"
+    ")" + END_STRING_SUFFIX,
+    re.DOTALL | re.UNICODE
+)
+# docutils splits literals to words and protects the words, where the browser
+# could break the line
+LITERAL_TOKEN_RE = re.compile(r"[^ \n]+| +|\n")
+WORD_WRAP_POINT_RE = re.compile(r".+\W\W.+|[-?].+", re.UNICODE)
+SPECIAL_CHARACTERS = [
+    ("&", "&amp;"),
+    ("<", "&lt;"),
+    (">", "&gt;"),
+    ('"', "&quot;"),
+    ("@", "&#64;"),
+]
+
+
+# Functions ===================================================================
+def _indent(line):
+    """
+    Args:
+        line (str): Line of text.
+
+    Returns:
+        int: Number of leading spaces of `line`.
+    """
+    return len(line) - len(line.lstrip())
+
+
+def _encode(text):
+    """
+    Replace HTML special characters in `text` the same way as docutils does.
+
+    Args:
+        text (str): Input string.
+
+    Returns:
+        str: String with entities.
+    """
+    for char, entity in SPECIAL_CHARACTERS:
+        text = text.replace(char, entity)
+
+    return text
+
+
+def _unescape(text):
+    """
+    Remove reST backslash escapes from `text`.
+
+    Args:
+        text (str): Input string.
+
+    Returns:
+        str: `text` without escapes.
+    """
+    return re.sub(r"\\(.)", r"\1", text)
+
+
+def _join(lines):
+    """
+    Join `lines` to one text. Lines ending with backslash are joined without
+    the newline.
+
+    Args:
+        lines (list): Lines of text.
+
+    Returns:
+        str: Joined text.
+    """
+    text = "\n".join(map(lambda x: x.strip(), lines))
+
+    return re.sub(r"\\\s*\n", "", text).strip()
+
+
+def _literal(text):
+    """
+    Convert content of the literal to HTML the same way as docutils does.
+
+    Args:
+        text (str): Content of the literal.
+
+    Returns:
+        str: HTML.
+    """
+    html = []
+    for token in LITERAL_TOKEN_RE.findall(text):
+        if token.strip():
+            if WORD_WRAP_POINT_RE.search(token):
+                html.append('<span class="pre">%s</span>' % _encode(token))
+            else:
+                html.append(_encode(token))
+        elif token in ("\n", " "):
+            html.append(token)
+        else:
+            html.append("&nbsp;" * (len(token) - 1) + " ")
+
+    return '<tt class="docutils literal">%s</tt>' % "".join(html)
+
+
+def inline_to_html(text):
+    """
+    Convert inline markup in `text` to HTML.
+
+    Supported is strong, emphasis, literal, cite and roles, which are
+    rendered as literals.
+
+    Args:
+        text (str): Text with inline markup.
+
+    Returns:
+        str: HTML.
+    """
+    html = []
+    last = 0
+    for match in INLINE_RE.finditer(text):
+        html.append(_encode(_unescape(text[last:match.start()])))
+        last = match.end()
+
+        kind = match.lastgroup
+        content = _encode(match.group(kind))
+
+        if kind in ("literal", "role"):
+            html.append(_literal(match.group(kind)))
+        elif kind == "strong":
+            html.append("<strong>%s</strong>" % content)
+        elif kind == "em":
+            html.append("<em>%s</em>" % content)
+        else:
+            html.append("<cite>%s</cite>" % content)
+
+    html.append(_encode(_unescape(text[last:])))
+
+    return "".join(html)
+
+
+def _paragraphs(lines, first=False, last=False):
+    """
+    Convert `lines` separated by blank lines to HTML paragraphs.
+
+    Args:
+        lines (list): Lines of text.
+        first (bool, default False): Add docutils ``first`` class to the
+            first paragraph.
+        last (bool, default False): Add docutils ``last`` class to the last
+            paragraph.
+
+    Returns:
+        list: ``<p>`` elements.
+    """
+    paragraphs = [[]]
+    for line in lines:
+        if line.strip():
+            paragraphs[-1].append(line)
+        elif paragraphs[-1]:
+            paragraphs.append([])
+
+    paragraphs = filter(None, paragraphs)
+
+    html = []
+    for cnt, paragraph in enumerate(paragraphs):
+        classes = []
+        if first and cnt == 0:
+            classes.append("first")
+        if last and cnt == len(paragraphs) - 1:
+            classes.append("last")
+
+        html.append(
+            "<p%s>%s</p>" % (
+                ' class="%s"' % " ".join(classes) if classes else "",
+                inline_to_html(_join(paragraph))
+            )
+        )
+
+    return html
+
+
+def _entries(lines):
+    """
+    Split section `lines` to entries. Each entry starts at the line with the
+    smallest indentation and continues with the more indented lines.
+
+    Args:
+        lines (list): Lines of the section.
+
+    Returns:
+        list: Tuples ``(first_line, [continuation_lines])``.
+    """
+    lines = filter(lambda x: x.strip(), lines)
+    if not lines:
+        return []
+
+    min_indent = min(map(_indent, lines))
+
+    entries = []
+    for line in lines:
+        if _indent(line) == min_indent or not entries:
+            entries.append((line.strip(), []))
+        else:
+            entries[-1][1].append(line)
+
+    return entries
+
+
+def _partition(line):
+    """
+    Split `line` on the first colon followed by whitespace.
+
+    Args:
+        line (str): Line like ``name (type): description``.
+
+    Returns:
+        tuple: ``(before, after)``. `after` is blank if there is no colon.
+    """
+    parts = re.split(r":(?:\s+|$)", line, 1)
+    if len(parts) == 1:
+        return line, ""
+
+    return parts[0].strip(), parts[1].strip()
+
+
+def _args_to_html(lines):
+    """
+    Convert lines of the ``Args`` section to content of the field body.
+
+    Returns:
+        str/list: HTML of the paragraph for one argument, or list of HTML \
+                  items of the bullet list for more arguments.
+    """
+    items = []
+    for first, rest in _entries(lines):
+        name, desc = _partition(first)
+
+        arg_type = ""
+        match = TYPED_ARG_RE.match(name)
+        if match:
+            name, arg_type = match.groups()
+            arg_type = " (<em>%s</em>)" % _encode(arg_type)
+
+        desc = inline_to_html(_join([desc] + rest))
+        items.append(
+            "<strong>%s</strong>%s%s" % (
+                _encode(name),
+                arg_type,
+                " -- " + desc if desc else ""
+            )
+        )
+
+    if len(items) == 1:
+        return items[0]
+
+    return items
+
+
+def _returns_to_html(lines):
+    """
+    Convert lines of the ``Returns`` or ``Yields`` section to content of the
+    field body.
+    """
+    lines = filter(lambda x: x.strip(), lines)
+    if not lines:
+        return ""
+
+    return_type, desc = _partition(lines[0].strip())
+    if not desc:
+        return inline_to_html(_join(lines))
+
+    desc = inline_to_html(_join([desc] + lines[1:]))
+
+    return "<em>%s</em> -- %s" % (_encode(return_type), desc)
+
+
+def _field(name, body):
+    """
+    Convert one field of the field list to HTML table row.
+
+    Args:
+        name (str): Name of the field, without colon.
+        body (str): HTML content of the field.
+
+    Returns:
+        str: HTML.
+    """
+    name = _encode(name) + ":"
+
+    if len(name) > FIELD_NAME_LIMIT:
+        return (
+            '<tr class="field"><th class="field-name" colspan="2">%s</th>'
+            '</tr>\n<tr class="field"><td>&nbsp;</td>'
+            '<td class="field-body">%s</td>\n</tr>'
+        ) % (name, body)
+
+    return (
+        '<tr class="field"><th class="field-name">%s</th>'
+        '<td class="field-body">%s</td>\n</tr>'
+    ) % (name, body)
+
+
+def _field_body(body, classes=None):
+    """
+    Convert content of the field body to HTML.
+
+    Args:
+        body (str/list): HTML of the paragraph, or list of HTML items of the
+            bullet list.
+        classes (list, default None): docutils classes of the paragraph or
+            list. None for compact field list, where the paragraphs are not
+            wrapped.
+
+    Returns:
+        str: HTML.
+    """
+    if isinstance(body, list):
+        return '<ul class="%s">\n%s\n</ul>\n' % (
+            " ".join(classes + ["simple"]),
+            "\n".join(map(lambda x: "<li>%s</li>" % x, body))
+        )
+
+    if classes is None or not body:
+        return body
+
+    return '<p class="%s">%s</p>\n' % (" ".join(classes), body)
+
+
+def _field_list(fields):
+    """
+    Convert `fields` to docutils field list table.
+
+    The list is compact (paragraphs are not wrapped), when all bodies are
+    paragraphs. Otherwise the ``last`` class is used only in the last field,
+    like in docutils.
+
+    Args:
+        fields (list): Tuples ``(name, body)``, see :func:`_field` and
+            :func:`_field_body`.
+
+    Returns:
+        str: HTML.
+    """
+    compact = not any(map(lambda x: isinstance(x[1], list), fields))
+
+    rows = []
+    for cnt, (name, body) in enumerate(fields):
+        classes = None
+        if not compact:
+            classes = ["first"]
+            if cnt == len(fields) - 1:
+                classes.append("last")
+
+        rows.append(_field(name, _field_body(body, classes)))
+
+    return "\n".join([
+        '<table class="docutils field-list" frame="void" rules="none">',
+        '<col class="field-name" />',
+        '<col class="field-body" />',
+        '<tbody valign="top">',
+    ] + rows + [
+        '</tbody>',
+        '</table>',
+    ])
+
+
+def _admonition(kind, lines):
+    """
+    Convert lines of the ``Note`` or ``See Also`` section to HTML.
+    """
+    title = '<p class="first admonition-title">%s</p>' % (
+        ADMONITION_TITLES[kind]
+    )
+
+    return '<div class="admonition %s">\n%s\n</div>' % (
+        kind,
+        "\n".join([title] + _paragraphs(lines, last=True))
+    )
+
+
+def _split_sections(lines):
+    """
+    Split `lines` of the docstring to text blocks and sections.
+
+    Args:
+        lines (list): Lines of the docstring.
+
+    Returns:
+        list: Tuples ``(kind, lines)``, where `kind` is ``text`` or one of \
+              values from :attr:`SECTIONS`.
+    """
+    blocks = []
+    pos = 0
+    while pos < len(lines):
+        line = lines[pos]
+        match = HEADER_RE.match(line)
+        kind = match and SECTIONS.get(match.group(2).strip().lower())
+
+        if not kind:
+            if not blocks or blocks[-1][0] != "text":
+                blocks.append(("text", []))
+            blocks[-1][1].append(line)
+            pos += 1
+            continue
+
+        # section continues with blank lines and more indented lines
+        header_indent = _indent(line)
+        pos += 1
+        section = []
+        while pos < len(lines) and (not lines[pos].strip() or
+                                    _indent(lines[pos]) > header_indent):
+            section.append(lines[pos])
+            pos += 1
+
+        blocks.append((kind, section))
+
+    return blocks
+
+
+def docstring_to_html(docstring):
+    """
+    Convert `docstring` in Google/Napoleon format to HTML.
+
+    The output is compatible with :func:`napoleon2html.napoleon_to_html`.
+
+    Args:
+        docstring (str): Docstring.
+
+    Returns:
+        str: HTML.
+    """
+    lines = inspect.cleandoc(docstring or "").expandtabs().splitlines()
+
+    html = []
+    fields = []
+    for kind, block in _split_sections(lines):
+        if kind == "args":
+            fields.append(("Parameters", _args_to_html(block)))
+            continue
+        elif kind == "returns":
+            fields.append(("returns", _returns_to_html(block)))
+            continue
+        elif kind == "yields":
+            fields.append(("Yields", _returns_to_html(block)))
+            continue
+        elif kind == "raises":
+            for first, rest in _entries(block):
+                name, desc = _partition(first)
+                desc = inline_to_html(_join([desc] + rest))
+                fields.append(("raises " + name, desc))
+            continue
+
+        # sections, which are not fields, close the field list
+        if fields:
+            html.append(_field_list(fields))
+            fields = []
+
+        if kind == "text":
+            html.extend(_paragraphs(block))
+        else:
+            html.append(_admonition(kind, block))
+
+    if fields:
+        html.append(_field_list(fields))
+
+    return "\n".join(html) + "\n"
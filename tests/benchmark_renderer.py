@@ -0,0 +1,50 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Interpreter version: python 2.7
+#
+"""
+Compare speed of the docstring renderers on the corpus of real docstrings.
+Docstrings, which napoleon fails to convert, are excluded.
+
+Run it from the root of the package::
+
+    $ python tests/benchmark_renderer.py
+"""
+# Imports ====================================================================
+import sys
+import timeit
+
+from napoleon2html import napoleon_to_html
+
+from test_renderer import corpus
+from test_renderer import napoleon_fails
+
+sys.path.insert(0, 'src')
+from bottle_gui.bottle_gui import RENDERERS
+
+
+# Variables ==================================================================
+REPEAT = 5
+
+
+# Main program ================================================================
+if __name__ == '__main__':
+    docstrings = filter(
+        lambda x: not napoleon_fails(napoleon_to_html(x)),
+        corpus()
+    )
+
+    for name, renderer in sorted(RENDERERS.items()):
+        best = min(
+            timeit.repeat(
+                lambda: map(renderer, docstrings),
+                repeat=REPEAT,
+                number=1
+            )
+        )
+
+        print "%-10s %8.3f ms/docstring" % (
+            name,
+            best / len(docstrings) * 1000
+        )
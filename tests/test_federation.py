@@ -0,0 +1,293 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Interpreter version: python 2.7
+# This work is licensed under a Creative Commons 3.0 Unported License
+# (http://creativecommons.org/licenses/by/3.0/).
+#
+# Imports ====================================================================
+import sys
+import copy
+import json
+import time
+import socket
+import threading
+from wsgiref.simple_server import make_server, WSGIRequestHandler
+
+import bottle
+import pytest
+import requests
+
+sys.path.insert(0, 'src')
+from bottle_gui import federation
+
+
+# Variables ==================================================================
+ADDR = "127.0.0.1"
+INDEX = [
+    {
+        u"/users": [
+            {
+                u"args": [u"user_id"],
+                u"docstring": u"Return the user.",
+                u"path": u"/users",
+                u"mdocstring": u"Users module docstring.",
+                u"module_name": u"services.users",
+                u"method": u"GET"
+            }
+        ]
+    }
+]
+SERVERS = []
+STATS = {"requests": 0, "not_modified": 0}
+
+
+# Functions & classes ========================================================
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def run_stand_in(app):
+    """
+    Run `app` in the background thread.
+
+    Returns:
+        str: URL of the running `app`.
+    """
+    server = make_server(ADDR, 0, app, handler_class=QuietHandler)
+    SERVERS.append(server)
+
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+
+    return "http://%s:%d/" % (ADDR, server.server_port)
+
+
+def index_app():
+    app = bottle.Bottle()
+
+    @app.route("/")
+    def index():
+        STATS["requests"] += 1
+
+        bottle.response.set_header("ETag", '"hash"')
+        if bottle.request.headers.get("If-None-Match") == '"hash"':
+            STATS["not_modified"] += 1
+            bottle.response.status = 304
+            return ""
+
+        bottle.response.content_type = "application/json"
+        return json.dumps(INDEX)
+
+    return app
+
+
+def failing_app():
+    app = bottle.Bottle()
+    app.route("/", callback=lambda: json.dumps(INDEX))
+    app.route("/broken", callback=lambda: bottle.abort(500, "Broken."))
+
+    return app
+
+
+def slow_app():
+    app = bottle.Bottle()
+
+    @app.route("/")
+    def index():
+        time.sleep(2)
+        return json.dumps(INDEX)
+
+    return app
+
+
+def malformed_app():
+    extra_key = copy.deepcopy(INDEX)
+    extra_key[0]["/users"][0]["new_key"] = u"value"
+
+    hostile = copy.deepcopy(INDEX)
+    hostile[0]["/users"][0].update({
+        "path": u'/x"><script>alert(1)</script>',
+        "method": u"<i>GET</i>",
+        "args": [u"<b>a</b>"],
+        "module_name": u"<s>mod</s>",
+        "mdocstring": u"<script>alert(2)</script>",
+        "docstring": u"<script>alert(3)</script>",
+    })
+
+    indexes = {
+        "list": [1, 2],
+        "empty": [{}],
+        "route": [{u"/users": [{u"path": 1}]}],
+        "args": [{u"/users": [dict(INDEX[0]["/users"][0], args=u"id")]}],
+        "link": [{u"/": [dict(INDEX[0]["/users"][0], path=u"javascript:")]}],
+        "extra_key": extra_key,
+        "hostile": hostile,
+    }
+
+    app = bottle.Bottle()
+    app.route("/<name>", callback=lambda name: json.dumps(indexes[name]))
+
+    return app
+
+
+def run_closing_socket():
+    """
+    Run server, which reads the request and closes the connection without
+    the response.
+
+    Returns:
+        str: URL of the server.
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind((ADDR, 0))
+    sock.listen(5)
+
+    def serve():
+        while True:
+            conn, _ = sock.accept()
+            conn.recv(4096)
+            conn.close()
+
+    thread = threading.Thread(target=serve)
+    thread.daemon = True
+    thread.start()
+
+    return "http://%s:%d/" % (ADDR, sock.getsockname()[1])
+
+
+# Setup/Teardown ==============================================================
+def teardown_module(module):
+    for server in SERVERS:
+        server.shutdown()
+        server.server_close()
+
+
+# Tests =======================================================================
+def test_revalidation():
+    fed = federation.Federation([run_stand_in(index_app())])
+
+    service = fed.refresh()[0]
+    assert service.status == "ok"
+    assert service.groups == INDEX
+    assert service.etag == '"hash"'
+
+    service = fed.refresh()[0]
+    assert service.status == "ok"
+    assert service.groups == INDEX
+    assert STATS == {"requests": 2, "not_modified": 1}
+
+
+def test_degradation():
+    url = run_stand_in(failing_app())
+    fed = federation.Federation(
+        [url, "http://%s:1/" % ADDR, run_stand_in(slow_app())],
+        timeout=0.5
+    )
+
+    start = time.time()
+    ok, down, slow = fed.refresh()
+    assert time.time() - start < 1.5  # services are downloaded concurrently
+
+    assert ok.status == "ok"
+    assert down.status == "down"
+    assert down.error
+    assert slow.status == "down"
+
+    # cached index is used, when the service is broken
+    ok.url = url + "broken"
+    fed.refresh()
+    assert ok.status == "stale"
+    assert ok.groups == INDEX
+
+    data = json.loads(fed.to_json())
+    assert map(lambda x: x["status"], data) == ["stale", "down", "down"]
+    assert data[0]["routes"] == INDEX
+    assert data[1]["routes"] == []
+
+    html = fed.to_html()
+    assert "Users module docstring." in html
+    assert "Return the user." in html
+    assert 'class="service_down"' in html
+
+
+def test_closed_connection():
+    fed = federation.Federation([run_closing_socket()])
+
+    service = fed.refresh()[0]
+    assert service.status == "down"
+    assert service.error
+    assert 'class="service_down"' in fed.to_html()
+
+
+def test_malformed_index():
+    url = run_stand_in(malformed_app())
+    names = [
+        "list", "empty", "route", "args", "link", "extra_key", "hostile"
+    ]
+    fed = federation.Federation(map(lambda x: url + x, names))
+
+    services = fed.refresh()
+    assert map(lambda x: x.status, services) == [
+        "down", "down", "down", "down", "down", "ok", "ok"
+    ]
+    assert all(map(lambda x: x.groups is None, services[:-2]))
+
+    # unknown keys are ignored
+    html = services[-2].to_html()
+    assert "Return the user." in html
+    assert "new_key" not in html
+
+    # values from the index are escaped
+    html = services[-1].to_html()
+    assert "<script>" not in html
+    assert "<b>a</b>" not in html
+    assert "<i>GET</i>" not in html
+    assert "/x&quot;&gt;&lt;script&gt;alert(1)&lt;/script&gt;" in html
+    assert "&lt;b&gt;a&lt;/b&gt;" in html
+
+
+def test_deadline():
+    fed = federation.Federation(
+        [run_stand_in(slow_app()), run_stand_in(slow_app())],
+        timeout=0.5,
+        workers=1
+    )
+
+    # downloads are limited by one deadline, not by timeout for each batch
+    start = time.time()
+    assert map(lambda x: x.status, fed.refresh()) == ["down", "down"]
+    assert time.time() - start < 1
+
+    # concurrent refreshes don't wait for each other
+    threads = map(lambda x: threading.Thread(target=fed.refresh), range(4))
+    start = time.time()
+    map(lambda x: x.start(), threads)
+    map(lambda x: x.join(), threads)
+    assert time.time() - start < 1
+
+
+def test_federated_gui():
+    url = run_stand_in(index_app())
+
+    app = bottle.default_app.push()
+    try:
+        federation.federated_gui([url], path="/fed", timeout=2)
+    finally:
+        bottle.default_app.pop()
+
+    fed_url = run_stand_in(app) + "fed"
+
+    # links lead to the service, not to the federated index
+    html = requests.get(fed_url).text
+    assert '<a href="%susers">/users</a>' % url in html
+    assert 'href="/users"' not in html
+
+    data = requests.get(fed_url, headers={"Accept": "application/json"}).json()
+    assert map(lambda x: (x["url"], x["status"]), data) == [(url, "ok")]
+    assert data[0]["routes"] == INDEX
+
+    with pytest.raises(ValueError):
+        federation.federated_gui([url], renderer="unknown")
@@ -9,6 +9,7 @@
 import sys
 import time
 import random
+import itertools
 from multiprocessing import Process
 
 import pytest
@@ -25,6 +26,7 @@ import bottle_gui
 ADDR = "127.0.0.1"
 PORT = random.randint(10000, 65525)
 URL = 'http://%s:%s%s' % (ADDR, PORT, "/")
+TREE_URL = URL + "tree"
 SERV = None
 
 
@@ -32,6 +34,8 @@ SERV = None
 def run_server():
     bottle_gui.bottle_gui.BLACKLIST = []
     bg = bottle_gui.gui()
+    tree_bg = bottle_gui.gui("/tree", tree=True)
+    builtin_bg = bottle_gui.gui("/builtin", tree=True, renderer="builtin")
     run(
         host=ADDR,
         port=PORT,
@@ -152,3 +156,264 @@ def test_json_output():
     assert static in data
     assert hist in data
     assert xex in data
+
+
+def test_tree_html_output():
+    res = requests.get(TREE_URL)
+    assert "<title>API index</title>" in res.text
+
+    assert 'data-path="/sources"' in res.text
+    assert "bottle_gui_toggle" in res.text
+
+    # subtrees are not rendered
+    assert "/sources/hist" not in res.text
+    assert "Here is hist docstring and so on." not in res.text
+
+
+def test_tree_subtree():
+    res = requests.get(URL + "bottle_gui_subtree", params={"path": "/sources"})
+    assert 'data-path="/sources/hist"' in res.text
+    assert 'data-path="/sources/xex"' in res.text
+    assert "Here is hist docstring and so on." not in res.text
+
+    res = requests.get(
+        URL + "bottle_gui_subtree",
+        params={"path": "/sources/hist"}
+    )
+    assert "Hist module level docstring." in res.text
+    assert "Here is hist docstring and so on." in res.text
+    assert 'data-path="/sources/hist/xe"' in res.text
+    assert "Here is hist/xe docstring and so on." not in res.text
+
+    res = requests.get(
+        URL + "bottle_gui_subtree",
+        params={"path": "/nonexistent"}
+    )
+    assert res.status_code == 404
+
+
+def test_build_tree():
+    routes = [
+        bottle_gui.bottle_gui.RouteInfo("GET", path, [], "", "", "mod")
+        for path in ["/", "/a", "/a/b", "/a/c/", "/d"]
+    ]
+
+    tree = bottle_gui.bottle_gui.build_tree(routes)
+
+    assert tree.count == 5
+    assert len(tree.routes) == 1
+    assert sorted(tree.children.keys()) == ["a", "d"]
+    assert tree.find("/a").count == 3
+    assert tree.find("/a/c/").path == "/a/c"
+    assert tree.find("/a/x") is None
+
+
+def test_json_version():
+    res = requests.get(URL, headers={'Accept': 'text/json'})
+    epoch, version = res.headers["X-Index-Version"].split("-")
+    assert int(version) >= 1
+
+    etag = res.headers["ETag"]
+    res = requests.get(
+        URL,
+        headers={'Accept': 'text/json', 'If-None-Match': etag}
+    )
+    assert res.status_code == 304
+    assert res.headers["ETag"] == etag
+
+
+def test_changes():
+    data = requests.get(URL + "bottle_gui_changes").json()
+    assert data["full"]
+    assert "/sources/xex" in map(lambda x: x["path"], data["routes"])
+
+    res = requests.get(
+        URL + "bottle_gui_changes",
+        params={"since": data["version"]}
+    )
+    data = res.json()
+    assert not data["full"]
+    assert data["added"] == data["removed"] == data["changed"] == []
+
+
+def test_route_index_delta():
+    def route(path, docstring=""):
+        return bottle_gui.bottle_gui.RouteInfo(
+            "GET", path, [], docstring, "", "mod"
+        )
+
+    index = bottle_gui.bottle_gui.RouteIndex(history_size=2)
+    first_token = index.token
+    assert index.update([route("/a"), route("/b")])
+    assert not index.update([route("/a"), route("/b")])
+    assert index.version == 1
+    token = index.token
+
+    old_hash = index.hash
+    assert index.update([route("/a", "changed"), route("/c")])
+    assert index.version == 2
+    assert index.hash != old_hash
+
+    delta = index.delta(token)
+    assert not delta["full"]
+    assert map(lambda x: x["path"], delta["added"]) == ["/c"]
+    assert map(lambda x: x["path"], delta["removed"]) == ["/b"]
+    assert map(lambda x: x["docstring"], delta["changed"]) == ["changed"]
+
+    # version 0 is out of the history window
+    delta = index.delta(first_token)
+    assert delta["full"]
+    assert map(lambda x: x["path"], delta["routes"]) == ["/a", "/c"]
+
+    assert index.delta("garbage")["full"]
+
+
+def test_route_index_restart():
+    def route(path):
+        return bottle_gui.bottle_gui.RouteInfo("GET", path, [], "", "", "mod")
+
+    old_index = bottle_gui.bottle_gui.RouteIndex()
+    old_index.update([route("/a")])
+
+    # restarted process with different routes reaches the same version
+    new_index = bottle_gui.bottle_gui.RouteIndex()
+    new_index.update([route("/a"), route("/b")])
+    assert new_index.version == old_index.version
+    assert new_index.token != old_index.token
+
+    delta = new_index.delta(old_index.token)
+    assert delta["full"]
+    assert map(lambda x: x["path"], delta["routes"]) == ["/a", "/b"]
+
+
+def test_blacklist_update():
+    module = bottle_gui.bottle_gui
+
+    def paths():
+        return map(lambda x: x.path, module.update_index().routes)
+
+    assert "/sources/xex" in paths()
+
+    module.BLACKLIST.append("/sources/xex")
+    try:
+        assert "/sources/xex" not in paths()
+        assert not module.ROUTE_INDEX.search_index.search("/sources/xex", 10)
+    finally:
+        module.BLACKLIST.remove("/sources/xex")
+
+    assert "/sources/xex" in paths()
+
+
+def test_search():
+    res = requests.get(URL + "bottle_gui_search", params={"q": "/sources/hi"})
+    paths = map(lambda x: x["route"]["path"], res.json()["results"])
+    assert paths == ["/sources/hist", "/sources/hist/xe"]
+
+    res = requests.get(URL + "bottle_gui_search", params={"q": "xe"})
+    paths = map(lambda x: x["route"]["path"], res.json()["results"])
+    assert paths == ["/sources/hist/xe"]
+
+    res = requests.get(URL + "bottle_gui_search", params={"q": "nothing"})
+    assert res.json()["results"] == []
+
+    res = requests.get(URL + "bottle_gui_search", params={"limit": "x"})
+    assert res.status_code == 400
+
+    for limit in ["0", "-1"]:
+        res = requests.get(
+            URL + "bottle_gui_search",
+            params={"q": "hist", "limit": limit}
+        )
+        assert res.status_code == 400
+
+
+def test_search_index():
+    def route(path, args, docstring, module_name="mod"):
+        return bottle_gui.bottle_gui.RouteInfo(
+            "GET", path, args, docstring, "", module_name
+        )
+
+    index = bottle_gui.bottle_gui.SearchIndex([
+        route("/users", ["user_id"], "Return the user."),
+        route("/users/avatar", ["user_id", "size"], "Return user avatar."),
+        route("/admin/stats", [], "Statistics.", "services.user"),
+    ])
+
+    def search(query, limit=50):
+        return map(
+            lambda x: (x["route"]["path"], x["score"]),
+            index.search(query, limit)
+        )
+
+    assert search("user") == [
+        ("/users", 5),
+        ("/users/avatar", 5),
+        ("/admin/stats", 2),
+    ]
+    assert search("user_id size") == [("/users/avatar", 17)]
+    assert search("/users user") == [("/users", 5), ("/users/avatar", 5)]
+    assert search("users") == [("/users", 8), ("/users/avatar", 8)]
+    assert search("/us", limit=1) == [("/users", 0)]
+    assert search("/admin/") == [("/admin/stats", 0)]
+    assert search("/users/") == [("/users/avatar", 0)]
+    assert search("/users/ user") == [("/users/avatar", 5)]
+    assert search("user", limit=0) == []
+    assert search("user", limit=-1) == []
+    assert search("") == []
+
+
+def test_prefix_search_large_tree():
+    def route(cnt, method="GET"):
+        return bottle_gui.bottle_gui.RouteInfo(
+            method,
+            "/api/v%d/r%d/x%d" % (cnt % 10, cnt % 1000, cnt),
+            [],
+            "",
+            "",
+            "mod"
+        )
+
+    routes = map(route, xrange(50000))
+    routes += [route(1, "POST"), route(2)]
+    routes[-1].path = "/api/v2"
+    tree = bottle_gui.bottle_gui.build_tree(routes)
+
+    def tree_order(route):
+        segments = bottle_gui.bottle_gui.split_path(route.path)
+        return (len(segments), segments, route.method)
+
+    def prefix_search(prefix, limit=None):
+        return list(itertools.islice(tree.iter_prefix(prefix), limit))
+
+    assert prefix_search("/") == sorted(routes, key=tree_order)
+    assert prefix_search("/api/v") == sorted(routes, key=tree_order)
+    assert prefix_search("/api/v1/r1") == sorted(
+        filter(lambda x: x.path.startswith("/api/v1/r1"), routes),
+        key=tree_order
+    )
+
+    # routes of the subtrees are cached, so the limit caps the cost
+    start = time.time()
+    for prefix in ["/", "/api/", "/api/v", "/api/v1/"]:
+        assert len(prefix_search(prefix, 10)) == 10
+    assert time.time() - start < 0.05
+
+
+def test_builtin_renderer():
+    res = requests.get(URL + "builtin")
+    assert "bottle_gui_subtree?renderer=builtin&path=" in res.text
+
+    res = requests.get(
+        URL + "bottle_gui_subtree",
+        params={"path": "/sources/hist", "renderer": "builtin"}
+    )
+    assert "<p>Here is hist docstring and so on.</p>" in res.text
+
+    res = requests.get(
+        URL + "bottle_gui_subtree",
+        params={"path": "/sources/hist", "renderer": "unknown"}
+    )
+    assert res.status_code == 400
+
+    with pytest.raises(ValueError):
+        bottle_gui.gui("/unknown", renderer="unknown")
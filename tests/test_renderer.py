@@ -0,0 +1,221 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Interpreter version: python 2.7
+# This work is licensed under a Creative Commons 3.0 Unported License
+# (http://creativecommons.org/licenses/by/3.0/).
+#
+# Imports ====================================================================
+import re
+import sys
+import inspect
+from HTMLParser import HTMLParser
+
+import pytest
+import napoleon2html
+from napoleon2html import napoleon_to_html
+
+import services  # local services for test purposes
+
+sys.path.insert(0, 'src')
+from bottle_gui import bottle_gui
+from bottle_gui import federation
+from bottle_gui import renderer
+from bottle_gui.renderer import docstring_to_html
+
+
+# Variables ==================================================================
+SAMPLES = [
+    """
+    Summary line.
+
+    Args:
+        a (int): Foo &amp; <b> "q" @x.
+
+    Returns:
+        Nothing special.
+    """,
+    """
+    Summary with ``literal``, `cite`, *emphasis* and **strong**.
+
+    Second paragraph
+    on two lines.
+
+    Args:
+        *args: Positional.
+        name(str): No space.
+        path (str, default "/"): Bottle path on which the application will be
+             available.
+
+    Raises:
+        ValueError: When bad.
+        KeyError: When missing.
+
+    Returns:
+        str: Foo.
+
+    Note:
+        Some note here.
+
+        Second paragraph of the note.
+    """,
+    """
+    Call with *args* or **kwargs**, but not 2*3*4, a*b* or "*".
+    Also (*c*), *a*b c*, ``x``y`` and *e*:f.
+    """,
+]
+
+
+# Functions & classes ========================================================
+def collect_docstrings(modules):
+    """
+    Collect docstrings of all classes, methods and functions defined in
+    `modules`.
+    """
+    docstrings = set()
+    for module in modules:
+        for name, obj in inspect.getmembers(module):
+            if getattr(obj, "__module__", None) != module.__name__:
+                continue
+
+            docstrings.add(inspect.getdoc(obj))
+
+            if inspect.isclass(obj):
+                for name, member in inspect.getmembers(obj):
+                    docstrings.add(inspect.getdoc(member))
+
+    return sorted(filter(None, docstrings))
+
+
+def to_text(html):
+    """
+    Return visible text of the `html` with normalized whitespaces.
+    """
+    text = HTMLParser().unescape(re.sub(r"<[^>]+>", " ", html))
+
+    return " ".join(text.replace(u"\xa0", " ").split())
+
+
+def normalize(html):
+    """
+    Return `html` with normalized whitespaces and without whitespaces
+    between tags.
+    """
+    return re.sub(r">\s+<", "><", " ".join(html.split()))
+
+
+def napoleon_fails(html):
+    """
+    napoleon produces sphinx directives unknown to docutils for Attributes
+    and See Also sections and puts leading fields to docinfo.
+    """
+    return "system-message" in html or not html.strip()
+
+
+def corpus():
+    """
+    Real docstrings. Roles are replaced with literals, because plain docutils
+    used by napoleon2html doesn't know them.
+    """
+    docstrings = collect_docstrings([
+        bottle_gui,
+        federation,
+        renderer,
+        napoleon2html,
+        services.hist,
+        services.xex,
+    ]) + map(inspect.cleandoc, SAMPLES)
+
+    return map(
+        lambda x: re.sub(r":[\w:.-]+:`(.+?)`", r"``\1``", x),
+        docstrings
+    )
+
+
+# Tests =======================================================================
+@pytest.mark.parametrize("docstring", corpus())
+def test_equivalence(docstring):
+    expected = napoleon_to_html(docstring)
+    if napoleon_fails(expected):
+        pytest.skip("Not supported by napoleon_to_html.")
+
+    html = docstring_to_html(docstring)
+    assert to_text(html) == to_text(expected)
+
+    # definition lists are not supported, only the text is the same
+    if "<dl" in expected:
+        pytest.skip("Not supported by docstring_to_html.")
+
+    assert normalize(html) == normalize(expected)
+
+
+def test_structure():
+    html = docstring_to_html(SAMPLES[1])
+
+    assert "<tt class=\"docutils literal\">literal</tt>" in html
+    assert "<cite>cite</cite>" in html
+    assert "<em>emphasis</em>" in html
+    assert "<strong>strong</strong>" in html
+    assert "<p>Second paragraph\non two lines.</p>" in html
+
+    assert html.count('<table class="docutils field-list"') == 1
+    assert '<th class="field-name">Parameters:</th>' in html
+    assert '<ul class="first simple">' in html
+    assert "<li><strong>*args</strong> -- Positional.</li>" in html
+    assert "<li><strong>name</strong> (<em>str</em>) -- No space.</li>" in html
+    assert '<th class="field-name" colspan="2">raises KeyError:</th>' in html
+    assert '<td class="field-body"><p class="first">When bad.</p>' in html
+    assert '<p class="first last"><em>str</em> -- Foo.</p>' in html
+
+    assert '<div class="admonition note">' in html
+    assert '<p class="last">Second paragraph of the note.</p>' in html
+
+
+def test_see_also_and_roles():
+    html = docstring_to_html("""
+    Convert group to dict.
+
+    Returns:
+        dict: {path: [routes]}
+
+    See Also:
+        :meth:`RouteInfo.to_dict`
+    """)
+
+    assert '<div class="admonition seealso">' in html
+    assert '<p class="first admonition-title">See also</p>' in html
+    assert '<tt class="docutils literal">RouteInfo.to_dict</tt>' in html
+
+
+def test_leading_section():
+    html = docstring_to_html("""
+    Returns:
+        dict: Dictionary with keys, \\
+              more.
+    """)
+
+    assert "<em>dict</em> -- Dictionary with keys, more." in html
+
+
+def test_compact_field_list():
+    html = docstring_to_html("""
+    Summary.
+
+    Args:
+        path (str): Path like ``/users/<id>`` and ``a  b``.
+
+    Returns:
+        str: HTML.
+    """)
+
+    assert "<p" not in html.split("\n", 1)[1]
+    assert '<td class="field-body"><em>str</em> -- HTML.</td>' in html
+    assert '<span class="pre">/users/&lt;id&gt;</span>' in html
+    assert '<tt class="docutils literal">a&nbsp; b</tt>' in html
+
+
+def test_markup_boundaries():
+    # docutils warns about the unclosed start-strings, but keeps the text
+    html = docstring_to_html("Use *args and **kwargs.")
+
+    assert html == "<p>Use *args and **kwargs.</p>\n"